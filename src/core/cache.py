@@ -0,0 +1,311 @@
+import contextvars
+import weakref
+from contextlib import contextmanager
+
+import redis
+import structlog
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient
+from opentelemetry import metrics
+from redis.client import Pipeline
+from redis.exceptions import MaxConnectionsError, RedisError
+
+from src.core.perf import track_cache_call
+
+logger = structlog.get_logger()
+meter = metrics.get_meter("pricewatch.cache")
+
+# Write operations deferred by `cache_pipeline()`, None when no pipeline is open
+_pending_ops = contextvars.ContextVar("cache_pipeline_ops", default=None)
+
+# Django keeps one cache backend per thread, each with its own connection pools
+_backends = weakref.WeakSet()
+
+cache_fail_open_counter = meter.create_counter(
+    name="cache_fail_open_total",
+    description="Number of cache operations skipped because Redis was unavailable",
+    unit="1",
+)
+
+redis_pool_exhausted_counter = meter.create_counter(
+    name="redis_pool_exhausted_total",
+    description="Number of times a Redis connection pool had no free connection",
+    unit="1",
+)
+
+
+def _iter_pools():
+    for backend in list(_backends):
+        # Only look at clients that exist, observing must not open connections
+        if "_cache" in backend.__dict__:
+            yield from backend._cache._pools.values()
+
+
+def _observe_pool_connections(options):
+    in_use = idle = 0
+    for pool in _iter_pools():
+        in_use += len(pool._in_use_connections)
+        idle += len(pool._available_connections)
+    yield metrics.Observation(in_use, {"state": "in_use"})
+    yield metrics.Observation(idle, {"state": "idle"})
+
+
+def _observe_pool_max_connections(options):
+    yield metrics.Observation(sum(pool.max_connections for pool in _iter_pools()))
+
+
+meter.create_observable_gauge(
+    name="redis_pool_connections",
+    callbacks=[_observe_pool_connections],
+    description="Redis connections per state across the cache connection pools",
+    unit="1",
+)
+
+meter.create_observable_gauge(
+    name="redis_pool_max_connections",
+    callbacks=[_observe_pool_max_connections],
+    description="Configured connection limit across the cache connection pools",
+    unit="1",
+)
+
+
+@contextmanager
+def cache_pipeline():
+    """
+    Defers cache writes (set, set_many, delete, delete_many) made inside the
+    block, and sends them to Redis in a single pipeline on exit.
+
+    Values are serialized when the write is made, so only Redis errors are left
+    for the flush. Reads still go straight to Redis and do not see writes
+    deferred in the same block.
+    Nested blocks join the outermost pipeline.
+    """
+    if _pending_ops.get() is not None:
+        yield
+        return
+
+    ops = []
+    token = _pending_ops.set(ops)
+    try:
+        yield
+    except BaseException:
+        _pending_ops.reset(token)
+        # Flush even if the block raised, invalidations must not be lost.
+        # A flush error must not replace the exception the block raised.
+        _flush_pipeline(ops, raise_errors=False)
+        raise
+
+    _pending_ops.reset(token)
+    _flush_pipeline(ops, raise_errors=True)
+
+
+def _flush_pipeline(ops, raise_errors):
+    backends = {}
+    for backend, op, args in ops:
+        backends.setdefault(backend, []).append((op, args))
+
+    for backend, backend_ops in backends.items():
+        try:
+            backend._execute_pipeline(backend_ops)
+        except RedisError as e:
+            if raise_errors:
+                raise
+            logger.error(
+                "cache_pipeline_flush_failed",
+                op_count=len(backend_ops),
+                error=str(e),
+            )
+
+
+class _AccountedPipeline(Pipeline):
+    def execute(self, raise_on_error=True):
+        with track_cache_call():
+            return super().execute(raise_on_error)
+
+
+class _AccountedRedis(redis.Redis):
+    """
+    Redis client that reports every round trip to `src.core.perf`.
+    Commands queued on a pipeline count once, when it is executed.
+    """
+
+    def execute_command(self, *args, **options):
+        with track_cache_call():
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return _AccountedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+        )
+
+
+class _AccountedRedisCacheClient(RedisCacheClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = _AccountedRedis
+
+
+class ResilientRedisCache(RedisCache):
+    """
+    RedisCache that joins `cache_pipeline()` blocks and, with the `fail_open`
+    option, treats Redis errors as cache misses so callers fall back to Postgres.
+
+    get_or_set() and decr() are covered through get()/add() and incr().
+    incr()/decr() are excluded from fail-open, there is no value they could
+    safely return, so they always raise.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = _AccountedRedisCacheClient
+        # Everything else in OPTIONS is passed through to the redis-py connection pool
+        self._options = dict(self._options)
+        self._fail_open = self._options.pop("fail_open", False)
+        _backends.add(self)
+
+    def _on_error(self, operation, exc, fallback):
+        if isinstance(exc, MaxConnectionsError):
+            redis_pool_exhausted_counter.add(1)
+        if not self._fail_open:
+            raise exc
+
+        cache_fail_open_counter.add(
+            1,
+            {
+                "operation": operation,
+                "error_type": type(exc).__name__,
+            },
+        )
+        logger.warning(
+            "cache_fail_open",
+            operation=operation,
+            error=str(exc),
+        )
+        return fallback
+
+    def _deferring(self):
+        return _pending_ops.get() is not None
+
+    def _defer(self, op, *args):
+        _pending_ops.get().append((self, op, args))
+
+    def _execute_pipeline(self, ops):
+        try:
+            client = self._cache.get_client(None, write=True)
+            pipe = client.pipeline(transaction=False)
+
+            # Same semantics as RedisCacheClient.set/set_many/delete/delete_many,
+            # values were already serialized when the op was deferred
+            for op, args in ops:
+                if op == "set":
+                    key, value, timeout = args
+                    if timeout == 0:
+                        pipe.delete(key)
+                    else:
+                        pipe.set(key, value, ex=timeout)
+                elif op == "set_many":
+                    data, timeout = args
+                    if timeout == 0:
+                        pipe.delete(*data)
+                        continue
+                    pipe.mset(data)
+                    if timeout is not None:
+                        for key in data:
+                            pipe.expire(key, timeout)
+                else:
+                    pipe.delete(*args[0])
+
+            pipe.execute()
+        except RedisError as e:
+            self._on_error("pipeline", e, None)
+
+    def get(self, key, default=None, version=None):
+        try:
+            return super().get(key, default, version)
+        except RedisError as e:
+            return self._on_error("get", e, default)
+
+    def get_many(self, keys, version=None):
+        try:
+            return super().get_many(keys, version)
+        except RedisError as e:
+            return self._on_error("get_many", e, {})
+
+    def has_key(self, key, version=None):
+        try:
+            return super().has_key(key, version)
+        except RedisError as e:
+            return self._on_error("has_key", e, False)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            return super().add(key, value, timeout, version)
+        except RedisError as e:
+            return self._on_error("add", e, False)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self._deferring():
+            # Serialize now, so a bad value raises here and not when the pipeline runs
+            self._defer(
+                "set",
+                self.make_and_validate_key(key, version=version),
+                self._cache._serializer.dumps(value),
+                self.get_backend_timeout(timeout),
+            )
+            return
+        try:
+            super().set(key, value, timeout, version)
+        except RedisError as e:
+            self._on_error("set", e, None)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if data and self._deferring():
+            safe_data = {
+                self.make_and_validate_key(key, version=version): (
+                    self._cache._serializer.dumps(value)
+                )
+                for key, value in data.items()
+            }
+            self._defer("set_many", safe_data, self.get_backend_timeout(timeout))
+            return []
+        try:
+            return super().set_many(data, timeout, version)
+        except RedisError as e:
+            return self._on_error("set_many", e, list(data))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            return super().touch(key, timeout, version)
+        except RedisError as e:
+            return self._on_error("touch", e, False)
+
+    def delete(self, key, version=None):
+        if self._deferring():
+            self._defer("delete", [self.make_and_validate_key(key, version=version)])
+            # The key may or may not exist, we only find out when the pipeline runs
+            return True
+        try:
+            return super().delete(key, version)
+        except RedisError as e:
+            return self._on_error("delete", e, False)
+
+    def clear(self):
+        try:
+            return super().clear()
+        except RedisError as e:
+            return self._on_error("clear", e, False)
+
+    def delete_many(self, keys, version=None):
+        if keys and self._deferring():
+            safe_keys = [
+                self.make_and_validate_key(key, version=version) for key in keys
+            ]
+            self._defer("delete_many", safe_keys)
+            return
+        try:
+            super().delete_many(keys, version)
+        except RedisError as e:
+            self._on_error("delete_many", e, None)
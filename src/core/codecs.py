@@ -0,0 +1,134 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+import msgpack
+import orjson
+from django.utils.cache import patch_vary_headers
+from ninja import NinjaAPI
+from ninja.renderers import BaseRenderer
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# msgpack extension type codes used by the cache serializer.
+# These are private to our Redis payloads and never sent to clients.
+_EXT_DECIMAL = 1
+_EXT_UUID = 2
+
+
+def _default_wire(value):
+    """
+    Fallback encoder for response payloads.
+    Decimals are sent as strings so clients never see a rounded float.
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+def _default_ext(value):
+    """
+    Fallback encoder for cache payloads.
+    Uses msgpack extension types so values round-trip with their exact type.
+    """
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+def _ext_hook(code, data):
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def dumps_json(data) -> bytes:
+    return orjson.dumps(
+        data,
+        default=_default_wire,
+        option=orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def dumps_msgpack(data) -> bytes:
+    return msgpack.packb(
+        data,
+        default=_default_wire,
+        use_bin_type=True,
+    )
+
+
+def accepts_msgpack(request) -> bool:
+    # Honours q-values and specificity, JSON wins ties (e.g. a bare */*)
+    preferred = request.get_preferred_type([JSON_MEDIA_TYPE, *MSGPACK_MEDIA_TYPES])
+    return preferred in MSGPACK_MEDIA_TYPES
+
+
+class MsgpackSerializer:
+    """
+    Redis cache serializer that replaces Django's default pickle.
+
+    Mirrors django.core.cache.backends.redis.RedisSerializer: plain integers
+    are stored unencoded so incr()/decr() keep working atomically.
+    """
+
+    def dumps(self, obj):
+        if type(obj) is int:
+            return obj
+        return msgpack.packb(
+            obj,
+            default=_default_ext,
+            use_bin_type=True,
+            datetime=True,
+        )
+
+    def loads(self, data):
+        try:
+            return int(data)
+        except ValueError:
+            return msgpack.unpackb(
+                data,
+                ext_hook=_ext_hook,
+                raw=False,
+                timestamp=3,
+            )
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Ninja renderer backed by orjson, with msgpack content negotiation.
+
+    Clients sending `Accept: application/msgpack` get a msgpack body,
+    everyone else gets JSON.
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, request, data, *, response_status):
+        if accepts_msgpack(request):
+            return dumps_msgpack(data)
+        return dumps_json(data)
+
+
+class NegotiatedNinjaAPI(NinjaAPI):
+    """
+    NinjaAPI derives the Content-Type from the renderer class, so it can't
+    vary per request. We correct it after the body has been rendered.
+    """
+
+    def create_response(self, request, data, *args, **kwargs):
+        response = super().create_response(request, data, *args, **kwargs)
+        if accepts_msgpack(request):
+            response["Content-Type"] = MSGPACK_MEDIA_TYPE
+        patch_vary_headers(response, ["Accept"])
+        return response
@@ -0,0 +1,72 @@
+import contextvars
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+# Stats of the request or task being tracked, None outside `track_performance()`
+_current_stats = contextvars.ContextVar("perf_stats", default=None)
+
+
+class PerfStats:
+    """
+    Number of DB queries and Redis round trips made in a unit of work,
+    and the time spent in each (in seconds).
+    """
+
+    __slots__ = ("db_queries", "db_time", "cache_calls", "cache_time")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_calls = 0
+        self.cache_time = 0.0
+
+
+def _count_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+@contextmanager
+def track_cache_call():
+    """
+    Accounts one Redis round trip to the current unit of work, if one is tracked.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.cache_calls += 1
+        stats.cache_time += time.perf_counter() - start
+
+
+@contextmanager
+def track_performance():
+    """
+    Counts the DB queries and Redis round trips made inside the block.
+
+    Yields the PerfStats being filled in, read it after the block exits.
+    """
+    stats = PerfStats()
+    token = _current_stats.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_count_query))
+            yield stats
+    finally:
+        _current_stats.reset(token)
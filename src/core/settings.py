@@ -34,7 +34,7 @@ ALLOWED_HOSTS = env.list(
 )
 
 CORS_ALLOW_ALL_ORIGINS = True
-CORS_EXPOSE_HEADERS = ["x-trace-id"]
+CORS_EXPOSE_HEADERS = ["x-trace-id", "server-timing"]
 CORS_ALLOW_HEADERS = (
     *default_headers,
     "x-trace-id",
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third Party
     "django_structlog",
     "corsheaders",
@@ -59,6 +60,8 @@ MIDDLEWARE = [
     "django_structlog.middlewares.RequestMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "src.tracker.middleware.TraceHeaderMiddleware",
+    "src.tracker.middleware.PerformanceBudgetMiddleware",
+    "src.tracker.middleware.CachePipelineMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -128,14 +131,40 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Per-request performance budgets, requests over any of them are flagged.
+# Unset means no budget.
+PERF_BUDGET_MAX_DB_QUERIES = env.int("PERF_BUDGET_MAX_DB_QUERIES", default=None)
+PERF_BUDGET_MAX_CACHE_CALLS = env.int("PERF_BUDGET_MAX_CACHE_CALLS", default=None)
+PERF_BUDGET_MAX_DURATION_MS = env.float("PERF_BUDGET_MAX_DURATION_MS", default=None)
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "BACKEND": "src.core.cache.ResilientRedisCache",
         "LOCATION": env(
             "REDIS_URL",
             default="redis://redis:6379/0",
         ),
         "KEY_PREFIX": SERVICE_NAME,
+        # Bumped whenever the serializer changes, so entries written by the old one
+        # are never read back (v1 was pickle)
+        "VERSION": 2,
+        "OPTIONS": {
+            # Set to "django.core.cache.backends.redis.RedisSerializer" to fall back to pickle
+            "serializer": env(
+                "CACHE_SERIALIZER",
+                default="src.core.codecs.MsgpackSerializer",
+            ),
+            # Serve from Postgres when Redis errors or times out instead of failing the request
+            "fail_open": env.bool("CACHE_FAIL_OPEN", default=True),
+            # Passed through to the redis-py connection pool
+            "max_connections": env.int("REDIS_MAX_CONNECTIONS", default=50),
+            "socket_timeout": env.float("REDIS_SOCKET_TIMEOUT", default=0.25),
+            "socket_connect_timeout": env.float(
+                "REDIS_SOCKET_CONNECT_TIMEOUT",
+                default=0.25,
+            ),
+            "health_check_interval": env.int("REDIS_HEALTH_CHECK_INTERVAL", default=30),
+        },
     }
 }
 
@@ -157,11 +186,45 @@ DRAMATIQ_BROKER = {
         "dramatiq.middleware.Retries",
         "django_dramatiq.middleware.DbConnectionsMiddleware",
         "src.tracker.dramatiq_telemetry.DramatiqWorkerTelemetry",
+        "src.tracker.dramatiq_concurrency.AdaptiveConcurrency",
     ],
 }
 
+# Adaptive worker concurrency (AIMD), bounds are clamped to the worker thread count
+WORKER_CONCURRENCY_MIN = env.int("WORKER_CONCURRENCY_MIN", default=1)
+WORKER_CONCURRENCY_MAX = env.int("WORKER_CONCURRENCY_MAX", default=8)
+WORKER_CONCURRENCY_INTERVAL = env.float("WORKER_CONCURRENCY_INTERVAL", default=5.0)
+# Mean message duration (s) and mean SQL query time (s) above which concurrency is halved
+WORKER_CONCURRENCY_MESSAGE_LATENCY_TARGET = env.float(
+    "WORKER_CONCURRENCY_MESSAGE_LATENCY_TARGET",
+    default=5.0,
+)
+WORKER_CONCURRENCY_DB_LATENCY_TARGET = env.float(
+    "WORKER_CONCURRENCY_DB_LATENCY_TARGET",
+    default=0.05,
+)
+
 DRAMATIQ_AUTODISCOVER_MODULES = ["tasks"]
 
+# Transactional outbox relay
+OUTBOX_RELAY_BATCH_SIZE = env.int("OUTBOX_RELAY_BATCH_SIZE", default=100)
+OUTBOX_RELAY_POLL_INTERVAL = env.float("OUTBOX_RELAY_POLL_INTERVAL", default=0.5)
+# Failed publishes before a message is dead lettered, broker outages do not count
+OUTBOX_RELAY_MAX_ATTEMPTS = env.int("OUTBOX_RELAY_MAX_ATTEMPTS", default=5)
+
+# Soft deleted rows are hard deleted by the purge job once older than this
+SOFT_DELETE_RETENTION_DAYS = env.int("SOFT_DELETE_RETENTION_DAYS", default=30)
+SOFT_DELETE_PURGE_BATCH_SIZE = env.int("SOFT_DELETE_PURGE_BATCH_SIZE", default=500)
+# Pause between purge batches so the purge never hogs the database
+SOFT_DELETE_PURGE_PAUSE_MS = env.int("SOFT_DELETE_PURGE_PAUSE_MS", default=1000)
+# How often `purge_deleted --schedule` enqueues a purge run
+SOFT_DELETE_PURGE_INTERVAL = env.int("SOFT_DELETE_PURGE_INTERVAL", default=3600)
+
+# Max number of triggered watches carried by a single notification message
+PRICE_ALERT_BATCH_SIZE = env.int("PRICE_ALERT_BATCH_SIZE", default=100)
+# How long a per-product threshold index lives in Redis before it is rebuilt
+PRICE_ALERT_INDEX_TTL = env.int("PRICE_ALERT_INDEX_TTL", default=3600)
+
 LOG_JSON = env.bool("LOG_JSON", default=True)
 
 LOGGING = {
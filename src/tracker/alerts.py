@@ -0,0 +1,189 @@
+from decimal import Decimal
+from typing import List, Optional
+
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError, WatchError
+
+from src.tracker.models import PriceWatch
+
+logger = structlog.get_logger()
+
+# Always present in a built index so an empty index is distinguishable from a
+# missing one. Scored -inf so it never falls inside a price range.
+_BUILT_MARKER = "__built__"
+
+
+# Updates an existing index in place and bumps the generation, so a build that
+# read Postgres before this watch was committed can no longer write its stale set.
+# A missing index is left missing, the next scrape builds it with the new watch.
+_ADD_WATCH_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    redis.call("ZADD", KEYS[1], ARGV[1], ARGV[2])
+end
+redis.call("INCR", KEYS[2])
+redis.call("EXPIRE", KEYS[2], ARGV[3])
+"""
+
+
+def _index_key(product_id) -> str:
+    return cache.make_key(f"price_watch:thresholds:{product_id}")
+
+
+def _generation_key(product_id) -> str:
+    # Bumped on every change to a product's watches
+    return cache.make_key(f"price_watch:thresholds:{product_id}:generation")
+
+
+def _redis_client():
+    # Share the connection pool of the default cache backend
+    return cache._cache.get_client(write=True)
+
+
+def _build_threshold_index(client, product_id) -> List[tuple]:
+    """
+    Loads all active thresholds for a product into a Redis sorted set,
+    scored by threshold price.
+
+    The set is only written if no watch changed since Postgres was read,
+    otherwise the build is dropped and the next scrape retries it.
+    """
+    key = _index_key(product_id)
+    generation_key = _generation_key(product_id)
+    # Read before Postgres, any change committed after this bumps the generation
+    generation = client.get(generation_key)
+
+    thresholds = list(
+        PriceWatch.objects.filter(product_id=product_id).values_list(
+            "id",
+            "threshold_price",
+        )
+    )
+
+    members = {str(watch_id): float(price) for watch_id, price in thresholds}
+    members[_BUILT_MARKER] = float("-inf")
+
+    pipe = client.pipeline(transaction=True)
+    try:
+        pipe.watch(generation_key)
+        if pipe.get(generation_key) != generation:
+            raise WatchError
+        pipe.multi()
+        pipe.delete(key)
+        pipe.zadd(key, members)
+        pipe.expire(key, settings.PRICE_ALERT_INDEX_TTL)
+        pipe.execute()
+    except WatchError:
+        logger.info(
+            "price_watch_index_build_superseded",
+            product_id=str(product_id),
+        )
+        return thresholds
+    finally:
+        pipe.reset()
+
+    logger.info(
+        "price_watch_index_built",
+        product_id=str(product_id),
+        watch_count=len(thresholds),
+    )
+    return thresholds
+
+
+def add_watch_to_index(product_id, watch_id, threshold_price: Decimal) -> None:
+    """
+    Adds a newly committed watch to the product's index, if one is built.
+    """
+    try:
+        _redis_client().eval(
+            _ADD_WATCH_SCRIPT,
+            2,
+            _index_key(product_id),
+            _generation_key(product_id),
+            float(threshold_price),
+            str(watch_id),
+            # Outlives any index built before the bump
+            settings.PRICE_ALERT_INDEX_TTL * 2,
+        )
+    except RedisError as e:
+        logger.warning(
+            "price_watch_index_update_failed",
+            product_id=str(product_id),
+            error=str(e),
+        )
+        # Without the generation bump a concurrent build could hide this watch
+        invalidate_threshold_index(product_id)
+
+
+def invalidate_threshold_index(product_id) -> None:
+    """
+    Drops the cached index and bumps the generation so no in-flight build
+    can restore it, the next scrape rebuilds it from Postgres.
+    """
+    generation_key = _generation_key(product_id)
+    try:
+        pipe = _redis_client().pipeline(transaction=True)
+        pipe.incr(generation_key)
+        pipe.expire(generation_key, settings.PRICE_ALERT_INDEX_TTL * 2)
+        pipe.delete(_index_key(product_id))
+        pipe.execute()
+    except RedisError as e:
+        # The index still expires on its own TTL
+        logger.warning(
+            "price_watch_index_invalidation_failed",
+            product_id=str(product_id),
+            error=str(e),
+        )
+
+
+def find_crossed_watches(
+    product_id,
+    old_price: Optional[Decimal],
+    new_price: Decimal,
+) -> List[str]:
+    """
+    Returns the ids of the watches whose threshold the price just dropped through,
+    i.e. new_price <= threshold < old_price.
+
+    Uses a ZRANGEBYSCORE over the per-product index, so the cost is
+    O(log n + m) in the number of watches n and crossed thresholds m.
+    """
+    if old_price is None or new_price >= old_price:
+        return []
+
+    low, high = float(new_price), float(old_price)
+    key = _index_key(product_id)
+
+    try:
+        client = _redis_client()
+
+        pipe = client.pipeline(transaction=False)
+        pipe.exists(key)
+        pipe.zrangebyscore(key, low, f"({high}")
+        exists, members = pipe.execute()
+
+        if exists:
+            return [member.decode() for member in members]
+
+        thresholds = _build_threshold_index(client, product_id)
+        return [
+            str(watch_id)
+            for watch_id, price in thresholds
+            if new_price <= price < old_price
+        ]
+    except RedisError as e:
+        logger.warning(
+            "price_watch_index_unavailable",
+            product_id=str(product_id),
+            error=str(e),
+        )
+        # Fall back to the partial (product, threshold_price) index in Postgres
+        return [
+            str(watch_id)
+            for watch_id in PriceWatch.objects.filter(
+                product_id=product_id,
+                threshold_price__gte=new_price,
+                threshold_price__lt=old_price,
+            ).values_list("id", flat=True)
+        ]
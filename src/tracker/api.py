@@ -1,19 +1,36 @@
+from decimal import Decimal, InvalidOperation
 from typing import List
 from uuid import UUID
 
 import structlog
 from django.core.cache import cache
-from django.db import connections
-from ninja import NinjaAPI, Router
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ninja import Query, Router
 from opentelemetry import metrics, trace
 from opentelemetry.trace import StatusCode
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 
-from src.tracker.models import Product
-from src.tracker.schema import ProductIn, ProductOut
+from src.core.codecs import NegotiatedNinjaAPI, ORJSONRenderer
+from src.tracker.alerts import add_watch_to_index
+from src.tracker.models import OutboxMessage, PriceWatch, Product, domain_from_url
+from src.tracker.schema import (
+    BulkResultOut,
+    PriceWatchIn,
+    PriceWatchOut,
+    ProductIdsIn,
+    ProductIn,
+    ProductOut,
+    ProductPage,
+    ProductSearchFilters,
+)
 from src.tracker.tasks import update_product_price
 
-api = NinjaAPI(title="PriceWatch API")
+api = NegotiatedNinjaAPI(
+    title="PriceWatch API",
+    renderer=ORJSONRenderer(),
+)
 logger = structlog.get_logger()
 meter = metrics.get_meter("pricewatch-api")
 propagator = TraceContextTextMapPropagator()
@@ -69,7 +86,8 @@ def readiness(request):
         )
 
     try:
-        cache.get("healthcheck")
+        # Ping directly, cache.get() would hide a Redis outage when failing open
+        cache._cache.get_client().ping()
     except Exception as e:
         logger.error(
             "readiness_check_failed_redis",
@@ -119,17 +137,23 @@ def on_exception(request, exc):
 
 @v1_router.post("/products", response=ProductOut)
 def create_product(request, data: ProductIn):
-    product = Product.objects.create(**data.dict())
-    product_created_counter.add(1, {"tenant_id": "default-org"})
-
     # --- TRIGGER WORKER WITH TRACE CONTEXT ---
     # 1. Create a 'carrier' dictionary
     carrier = {}
     # 2. Inject current trace context into the carrier
     propagator.inject(carrier=carrier)
 
-    # 3. Send to Dramatiq
-    update_product_price.send(str(product.id), carrier)
+    # 3. Record the Dramatiq message in the same transaction as the product.
+    # `relay_outbox` publishes it, so the broker is not on the request path.
+    with transaction.atomic():
+        product = Product.objects.create(**data.dict())
+        OutboxMessage.objects.create(
+            actor_name=update_product_price.actor_name,
+            args=[str(product.id)],
+            trace_carrier=carrier,
+        )
+
+    product_created_counter.add(1, {"tenant_id": "default-org"})
 
     logger.info(
         "product_created",
@@ -141,7 +165,101 @@ def create_product(request, data: ProductIn):
 
 @v1_router.get("/products", response=List[ProductOut])
 def list_products(request):
-    return Product.objects.all()
+    return Product.objects.order_by("id")
+
+
+@v1_router.post("/products/bulk-delete", response=BulkResultOut)
+def bulk_delete_products(request, data: ProductIdsIn):
+    # Same timestamp for the products and their watches, so both are purged together
+    now = timezone.now()
+    with transaction.atomic():
+        count = Product.objects.filter(id__in=data.ids).soft_delete(now)
+        PriceWatch.objects.filter(product_id__in=data.ids).soft_delete(now)
+    cache.delete_many([f"product:{product_id}" for product_id in data.ids])
+
+    logger.info("products_soft_deleted", count=count)
+    return {"count": count}
+
+
+@v1_router.post("/products/bulk-restore", response=BulkResultOut)
+def bulk_restore_products(request, data: ProductIdsIn):
+    now = timezone.now()
+    with transaction.atomic():
+        count = Product.all_objects.filter(id__in=data.ids).restore(now)
+        PriceWatch.all_objects.filter(product_id__in=data.ids).restore(now)
+    cache.delete_many([f"product:{product_id}" for product_id in data.ids])
+
+    logger.info("products_restored", count=count)
+    return {"count": count}
+
+
+@v1_router.get("/products/search", response=ProductPage)
+def search_products(request, filters: Query[ProductSearchFilters]):
+    """
+    Keyset-paginated search over active products.
+
+    Price range searches page in (target_price, id) order so they walk
+    `idx_active_product_price`, every other search pages in id order.
+    """
+    products = Product.objects.only("id", "name", "url", "target_price")
+    by_price = filters.min_price is not None or filters.max_price is not None
+
+    if filters.q:
+        products = products.filter(name__icontains=filters.q)
+    if filters.min_price is not None:
+        products = products.filter(target_price__gte=filters.min_price)
+    if filters.max_price is not None:
+        products = products.filter(target_price__lte=filters.max_price)
+    if filters.domain:
+        products = products.filter(domain=domain_from_url(filters.domain))
+
+    if filters.cursor:
+        try:
+            last_price, last_id = _decode_search_cursor(filters.cursor, by_price)
+        except ValueError:
+            return api.create_response(
+                request,
+                {"error": "Invalid cursor"},
+                status=400,
+            )
+
+        if by_price:
+            # (target_price, id) > (last_price, last_id), written so that
+            # target_price >= last_price stays an index condition
+            products = products.filter(target_price__gte=last_price).filter(
+                ~Q(target_price=last_price) | Q(id__gt=last_id)
+            )
+        else:
+            products = products.filter(id__gt=last_id)
+
+    # uuid7 ids are time ordered, so id order is also creation order.
+    # Fetch one extra row to know whether there is a next page.
+    ordering = ("target_price", "id") if by_price else ("id",)
+    items = list(products.order_by(*ordering)[: filters.limit + 1])
+    next_cursor = None
+    if len(items) > filters.limit:
+        items = items[: filters.limit]
+        last = items[-1]
+        next_cursor = f"{last.target_price}_{last.id}" if by_price else str(last.id)
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _decode_search_cursor(cursor: str, by_price: bool):
+    """
+    Splits a search cursor into (target_price, id), target_price is None for id order.
+    Raises ValueError when the cursor does not match the ordering of the search.
+    """
+    if not by_price:
+        return None, UUID(cursor)
+
+    price, separator, product_id = cursor.partition("_")
+    if not separator:
+        raise ValueError("Cursor has no price component")
+    try:
+        return Decimal(price), UUID(product_id)
+    except InvalidOperation as e:
+        raise ValueError("Invalid price in cursor") from e
 
 
 @v1_router.get("/products/{product_id}", response=ProductOut)
@@ -160,7 +278,9 @@ def get_product(
     try:
         product = Product.objects.get(id=product_id)
         cache_misses_counter.add(1, {"service": "pricewatch-api"})
-        cache.set(cache_key, product, timeout=300)
+        # Cache the serialized schema rather than the model instance,
+        # so the payload stays compact and codec-agnostic
+        cache.set(cache_key, ProductOut.from_orm(product).dict(), timeout=300)
 
         logger.info("product_cache_miss", product_id=product_id)
         return product
@@ -170,3 +290,41 @@ def get_product(
             {"error": "Not Found"},
             status=404,
         )
+
+
+@v1_router.post("/products/{product_id}/watches", response=PriceWatchOut)
+def create_price_watch(
+    request,
+    product_id: UUID,
+    data: PriceWatchIn,
+):
+    if not Product.objects.filter(id=product_id).exists():
+        return api.create_response(
+            request,
+            {"error": "Not Found"},
+            status=404,
+        )
+
+    watch = PriceWatch.objects.create(product_id=product_id, **data.dict())
+    transaction.on_commit(
+        lambda: add_watch_to_index(product_id, watch.id, watch.threshold_price)
+    )
+
+    logger.info(
+        "price_watch_created",
+        product_id=str(product_id),
+        watch_id=str(watch.id),
+    )
+    return watch
+
+
+@v1_router.get("/products/{product_id}/watches", response=List[PriceWatchOut])
+def list_price_watches(
+    request,
+    product_id: UUID,
+):
+    # Watches of products deleted before they were cascaded are still active
+    return PriceWatch.objects.filter(
+        product_id=product_id,
+        product__is_deleted=False,
+    )
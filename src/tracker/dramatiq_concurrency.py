@@ -0,0 +1,268 @@
+import threading
+import time
+from contextlib import ExitStack
+from functools import partial
+
+import dramatiq
+import pika
+import structlog
+from django.conf import settings
+from dramatiq.brokers.rabbitmq import RabbitmqBroker
+from dramatiq.common import dq_name
+from opentelemetry import metrics
+
+from src.core.perf import track_performance
+
+logger = structlog.get_logger()
+meter = metrics.get_meter("pricewatch.worker")
+
+concurrency_slots_gauge = meter.create_gauge(
+    name="worker_concurrency_slots",
+    description="Number of messages the worker is allowed to process at once",
+    unit="1",
+)
+
+concurrency_prefetch_gauge = meter.create_gauge(
+    name="worker_concurrency_prefetch",
+    description="Prefetch count requested from the broker per queue",
+    unit="1",
+)
+
+concurrency_queue_depth_gauge = meter.create_gauge(
+    name="worker_concurrency_queue_depth",
+    description="Ready messages across the consumed queues, as seen by the controller",
+    unit="1",
+)
+
+concurrency_adjustments_counter = meter.create_counter(
+    name="worker_concurrency_adjustments_total",
+    description="Number of concurrency changes made by the controller",
+    unit="1",
+)
+
+
+class _Slots:
+    """
+    A semaphore whose limit can be changed while threads are waiting on it.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.active >= self.limit:
+                self._condition.wait()
+            self.active += 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def resize(self, limit):
+        with self._condition:
+            self.limit = limit
+            self._condition.notify_all()
+
+
+class AdaptiveConcurrency(dramatiq.Middleware):
+    """
+    AIMD controller for the number of messages a worker processes at once.
+
+    Every WORKER_CONCURRENCY_INTERVAL seconds it looks at the queue depth, the
+    mean message duration (the scrape) and the mean SQL query time of the last
+    window. The slot count is halved when either latency is over its target.
+    Otherwise it grows by one while there is a backlog. Prefetch follows at
+    twice the slot count, which matches Dramatiq's default ratio.
+    """
+
+    def __init__(self):
+        self.min_slots = settings.WORKER_CONCURRENCY_MIN
+        self.max_slots = settings.WORKER_CONCURRENCY_MAX
+        self.interval = settings.WORKER_CONCURRENCY_INTERVAL
+        self.message_latency_target = settings.WORKER_CONCURRENCY_MESSAGE_LATENCY_TARGET
+        self.db_latency_target = settings.WORKER_CONCURRENCY_DB_LATENCY_TARGET
+
+        self.slots = _Slots(self.max_slots)
+        self.local = threading.local()
+        self.worker = None
+        self.stop_event = threading.Event()
+        # Owned by the controller thread, used for queue depth only
+        self.connection = None
+        self.channel = None
+
+        self.window_lock = threading.Lock()
+        self._reset_window()
+
+    def _reset_window(self):
+        self.window_messages = 0
+        self.window_duration = 0.0
+        self.window_db_queries = 0
+        self.window_db_time = 0.0
+
+    def after_worker_boot(self, broker, worker):
+        self.worker = worker
+        # Slots beyond the worker thread count could never be used
+        self.max_slots = min(self.max_slots, worker.worker_threads)
+        self.min_slots = min(self.min_slots, self.max_slots)
+        self._set_slots(self.max_slots)
+
+        threading.Thread(
+            target=self._run,
+            args=(broker,),
+            name="adaptive-concurrency",
+            daemon=True,
+        ).start()
+
+    def before_worker_shutdown(self, broker, worker):
+        self.stop_event.set()
+        # Let any thread waiting for a slot drain its message
+        self.slots.resize(self.max_slots)
+
+    def before_process_message(self, broker, message):
+        self.slots.acquire()
+
+        stack = ExitStack()
+        self.local.stats = stack.enter_context(track_performance())
+        self.local.stack = stack
+        self.local.start_time = time.perf_counter()
+
+    def after_process_message(self, broker, message, *, result=None, exception=None):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            # Skipped by an earlier middleware before we acquired a slot
+            return
+
+        duration = time.perf_counter() - self.local.start_time
+        stack.close()
+        stats = self.local.stats
+        self.local.stack = None
+
+        with self.window_lock:
+            self.window_messages += 1
+            self.window_duration += duration
+            self.window_db_queries += stats.db_queries
+            self.window_db_time += stats.db_time
+
+        self.slots.release()
+
+    after_skip_message = after_process_message
+
+    def _queue_depth(self, broker):
+        """
+        Ready messages across the consumed queues, read with a passive queue_declare
+        on the controller's own connection (pika connections are not thread safe).
+        """
+        if not isinstance(broker, RabbitmqBroker):
+            return None
+
+        try:
+            if self.channel is None or not self.channel.is_open:
+                if self.connection is None or not self.connection.is_open:
+                    self.connection = pika.BlockingConnection(
+                        parameters=broker.parameters
+                    )
+                self.channel = self.connection.channel()
+
+            depth = 0
+            for queue_name in self.worker.consumers:
+                if dq_name(queue_name) == queue_name:
+                    continue
+                frame = self.channel.queue_declare(queue=queue_name, passive=True)
+                depth += frame.method.message_count
+            return depth
+        except pika.exceptions.AMQPError as e:
+            # A failed passive declare closes the channel, reopen it next tick
+            self.channel = None
+            logger.warning("worker_concurrency_queue_depth_failed", error=str(e))
+            return None
+
+    def _set_slots(self, slots):
+        self.slots.resize(slots)
+        prefetch = slots * 2
+
+        for queue_name, thread in self.worker.consumers.items():
+            if dq_name(queue_name) == queue_name:
+                continue
+            # Used when the consumer reconnects
+            thread.prefetch = prefetch
+            consumer = thread.consumer
+            if consumer is None or not hasattr(consumer, "channel"):
+                continue
+            try:
+                # pika is not thread safe, run basic_qos on the consumer's own thread
+                consumer.connection.add_callback_threadsafe(
+                    partial(consumer.channel.basic_qos, prefetch_count=prefetch),
+                )
+            except Exception as e:
+                # e.g. the connection is closing, the consumer reconnects with `thread.prefetch`
+                logger.warning(
+                    "worker_concurrency_prefetch_update_failed",
+                    queue_name=queue_name,
+                    error=str(e),
+                )
+
+        concurrency_slots_gauge.set(slots)
+        concurrency_prefetch_gauge.set(prefetch)
+
+    def _run(self, broker):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self._adjust(broker)
+            except Exception as e:
+                logger.error("worker_concurrency_adjust_failed", error=str(e))
+
+        if self.connection is not None and self.connection.is_open:
+            try:
+                self.connection.close()
+            except pika.exceptions.AMQPError:
+                pass
+
+    def _adjust(self, broker):
+        with self.window_lock:
+            messages = self.window_messages
+            message_latency = self.window_duration / messages if messages else 0.0
+            db_latency = (
+                self.window_db_time / self.window_db_queries
+                if self.window_db_queries
+                else 0.0
+            )
+            self._reset_window()
+
+        depth = self._queue_depth(broker)
+        if depth is not None:
+            concurrency_queue_depth_gauge.set(depth)
+
+        current = self.slots.limit
+        if db_latency > self.db_latency_target:
+            direction, reason = "decrease", "db_latency"
+            target = max(self.min_slots, current // 2)
+        elif message_latency > self.message_latency_target:
+            direction, reason = "decrease", "message_latency"
+            target = max(self.min_slots, current // 2)
+        elif depth and self.slots.active >= current:
+            direction, reason = "increase", "backlog"
+            target = min(self.max_slots, current + 1)
+        else:
+            return
+
+        if target == current:
+            return
+
+        self._set_slots(target)
+        concurrency_adjustments_counter.add(
+            1,
+            {"direction": direction, "reason": reason},
+        )
+        logger.info(
+            "worker_concurrency_adjusted",
+            direction=direction,
+            reason=reason,
+            slots=target,
+            queue_depth=depth,
+            message_latency=message_latency,
+            db_latency=db_latency,
+        )
@@ -0,0 +1,70 @@
+import pickle
+import timeit
+from decimal import Decimal
+
+import uuid6
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from src.core.codecs import MsgpackSerializer, dumps_json, dumps_msgpack
+from src.tracker.models import Product
+from src.tracker.schema import ProductOut
+
+
+class Command(BaseCommand):
+    help = "Compare pickle against the msgpack/orjson codecs for a product payload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        # Built in memory, nothing is written to the database
+        product = Product(
+            id=uuid6.uuid7(),
+            name="Mechanical Keyboard",
+            url="https://example.com/products/mechanical-keyboard",
+            target_price=Decimal("79.99"),
+            created_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        payload = ProductOut.from_orm(product).dict()
+        serializer = MsgpackSerializer()
+
+        # (name, encode, decode) for every codec we care about
+        codecs = [
+            (
+                "pickle (model instance)",
+                lambda: pickle.dumps(product, pickle.HIGHEST_PROTOCOL),
+                pickle.loads,
+            ),
+            (
+                "pickle (dict)",
+                lambda: pickle.dumps(payload, pickle.HIGHEST_PROTOCOL),
+                pickle.loads,
+            ),
+            ("msgpack cache", lambda: serializer.dumps(payload), serializer.loads),
+            ("msgpack response", lambda: dumps_msgpack(payload), None),
+            ("orjson response", lambda: dumps_json(payload), None),
+        ]
+
+        self.stdout.write(
+            f"{'codec':<26}{'bytes':>8}{'encode us':>12}{'decode us':>12}"
+        )
+        for name, encode, decode in codecs:
+            encoded = encode()
+            encode_us = timeit.timeit(encode, number=iterations) / iterations * 1e6
+
+            decode_col = "-"
+            if decode is not None:
+                decode_us = (
+                    timeit.timeit(lambda: decode(encoded), number=iterations)
+                    / iterations
+                    * 1e6
+                )
+                decode_col = f"{decode_us:.2f}"
+
+            self.stdout.write(
+                f"{name:<26}{len(encoded):>8}{encode_us:>12.2f}{decode_col:>12}"
+            )
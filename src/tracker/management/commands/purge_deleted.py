@@ -0,0 +1,51 @@
+import os
+import time
+
+import structlog
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from dramatiq.errors import DramatiqError
+
+from src.core.telemetry import init_telemetry
+from src.tracker.tasks import purge_deleted_products
+
+
+class Command(BaseCommand):
+    help = "Enqueue the job that hard deletes soft deleted rows past their retention"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            help="Keep running and enqueue the job every --interval seconds",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.SOFT_DELETE_PURGE_INTERVAL,
+        )
+
+    def handle(self, *args, **options):
+        # The job re-enqueues itself batch by batch until nothing is left to purge
+        if not options["schedule"]:
+            purge_deleted_products.send()
+            self.stdout.write("Purge job enqueued")
+            return
+
+        init_telemetry(os.getenv("SERVICE_NAME", "pricewatch-purge-scheduler"))
+
+        logger = structlog.get_logger()
+        interval = options["interval"]
+
+        logger.info("purge_scheduler_online", interval=interval)
+
+        try:
+            while True:
+                try:
+                    purge_deleted_products.send()
+                    logger.info("purge_job_enqueued")
+                except DramatiqError as e:
+                    logger.error("purge_job_enqueue_failed", error=str(e))
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            logger.info("purge_scheduler_stopped")
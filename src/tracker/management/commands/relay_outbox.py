@@ -0,0 +1,66 @@
+import os
+import time
+
+import dramatiq
+import structlog
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+from dramatiq.errors import DramatiqError
+
+from src.core.telemetry import init_telemetry
+
+
+class Command(BaseCommand):
+    help = "Drain the transactional outbox and publish its messages to the broker"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.OUTBOX_RELAY_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.OUTBOX_RELAY_POLL_INTERVAL,
+        )
+
+    def handle(self, *args, **options):
+        init_telemetry(os.getenv("SERVICE_NAME", "pricewatch-outbox-relay"))
+
+        # Registers the actors with the broker
+        import src.tracker.tasks  # noqa: F401
+        from src.tracker.outbox import relay_batch
+
+        # Publisher confirms for this process only, so the relay only deletes what
+        # the broker accepted. Read when a channel is opened, none is open yet.
+        # Each send waits for its own confirm, only the DB side is batched.
+        dramatiq.get_broker().confirm_delivery = True
+
+        logger = structlog.get_logger()
+        batch_size = options["batch_size"]
+        poll_interval = options["poll_interval"]
+
+        logger.info("outbox_relay_online", batch_size=batch_size)
+
+        try:
+            while True:
+                # Drops connections past CONN_MAX_AGE or broken by a Postgres restart
+                close_old_connections()
+                try:
+                    published = relay_batch(batch_size)
+                except (DatabaseError, DramatiqError) as e:
+                    logger.error(
+                        "outbox_relay_batch_failed",
+                        error_type=type(e).__name__,
+                        error=str(e),
+                    )
+                    time.sleep(poll_interval)
+                    continue
+
+                # A full batch means there is probably more waiting, go again right away
+                if published < batch_size:
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            logger.info("outbox_relay_stopped")
@@ -1,5 +1,45 @@
+import time
+
+import structlog
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+
+from src.core.cache import cache_pipeline
+from src.core.perf import track_performance
+
+logger = structlog.get_logger()
+meter = metrics.get_meter("pricewatch-api")
+
+request_db_queries_histogram = meter.create_histogram(
+    name="http_request_db_queries",
+    description="Number of SQL queries made per request",
+    unit="1",
+)
+
+request_db_duration_histogram = meter.create_histogram(
+    name="http_request_db_duration_seconds",
+    description="Time spent in SQL queries per request",
+    unit="s",
+)
+
+request_cache_calls_histogram = meter.create_histogram(
+    name="http_request_cache_calls",
+    description="Number of Redis round trips made per request",
+    unit="1",
+)
+
+request_cache_duration_histogram = meter.create_histogram(
+    name="http_request_cache_duration_seconds",
+    description="Time spent in Redis round trips per request",
+    unit="s",
+)
+
+request_budget_exceeded_counter = meter.create_counter(
+    name="http_request_budget_exceeded_total",
+    description="Number of requests that went over a configured performance budget",
+    unit="1",
+)
 
 
 class TraceHeaderMiddleware(MiddlewareMixin):
@@ -9,3 +49,94 @@ class TraceHeaderMiddleware(MiddlewareMixin):
         if span_context.is_valid:
             response["X-Trace-Id"] = format(span_context.trace_id, "032x")
         return response
+
+
+class CachePipelineMiddleware:
+    """
+    Sends all cache writes made while handling a request to Redis as one pipeline.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with cache_pipeline():
+            return self.get_response(request)
+
+
+class PerformanceBudgetMiddleware:
+    """
+    Accounts the SQL queries and Redis round trips of every request.
+
+    Totals are attached to the request span, returned as a `Server-Timing`
+    header and recorded as per-route histograms. Requests over one of the
+    PERF_BUDGET_* settings are flagged.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budgets = {
+            "db_queries": settings.PERF_BUDGET_MAX_DB_QUERIES,
+            "cache_calls": settings.PERF_BUDGET_MAX_CACHE_CALLS,
+            "duration_ms": settings.PERF_BUDGET_MAX_DURATION_MS,
+        }
+
+    def __call__(self, request):
+        start_time = time.perf_counter()
+        with track_performance() as stats:
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start_time) * 1000
+
+        # The route pattern, not the path, to keep the metric cardinality bounded
+        match = request.resolver_match
+        route = match.route if match else "unmatched"
+        attributes = {"http.route": route}
+
+        request_db_queries_histogram.record(stats.db_queries, attributes)
+        request_db_duration_histogram.record(stats.db_time, attributes)
+        request_cache_calls_histogram.record(stats.cache_calls, attributes)
+        request_cache_duration_histogram.record(stats.cache_time, attributes)
+
+        span = trace.get_current_span()
+        span.set_attributes(
+            {
+                "perf.db.queries": stats.db_queries,
+                "perf.db.duration_ms": stats.db_time * 1000,
+                "perf.cache.calls": stats.cache_calls,
+                "perf.cache.duration_ms": stats.cache_time * 1000,
+            }
+        )
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.db_queries} queries"',
+                f'cache;dur={stats.cache_time * 1000:.2f};desc="{stats.cache_calls} calls"',
+                f"total;dur={duration_ms:.2f}",
+            ]
+        )
+
+        usage = {
+            "db_queries": stats.db_queries,
+            "cache_calls": stats.cache_calls,
+            "duration_ms": duration_ms,
+        }
+        exceeded = [
+            budget
+            for budget, limit in self.budgets.items()
+            if limit is not None and usage[budget] > limit
+        ]
+        if exceeded:
+            span.set_attribute("perf.budget_exceeded", exceeded)
+            for budget in exceeded:
+                request_budget_exceeded_counter.add(
+                    1,
+                    {**attributes, "budget": budget},
+                )
+            logger.warning(
+                "request_budget_exceeded",
+                route=route,
+                exceeded=exceeded,
+                **usage,
+            )
+
+        return response
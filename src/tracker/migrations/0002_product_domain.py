@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-19 10:31
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='domain',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+    ]
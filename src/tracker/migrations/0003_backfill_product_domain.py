@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-19 10:31
+
+from urllib.parse import urlsplit
+
+from django.db import migrations, transaction
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def domain_from_url(url):
+    # Frozen copy of src.tracker.models.domain_from_url as of this migration
+    if '//' not in url:
+        url = f'//{url}'
+    hostname = (urlsplit(url).hostname or '').lower()
+    return hostname.removeprefix('www.')
+
+
+def backfill_domain(apps, schema_editor):
+    Product = apps.get_model('tracker', 'Product')
+    last_id = None
+    while True:
+        # One transaction per batch, so rows are only locked until the batch commits
+        with transaction.atomic():
+            batch = Product._base_manager.order_by('id').only('id', 'url')
+            if last_id is not None:
+                batch = batch.filter(id__gt=last_id)
+            batch = list(batch[:BACKFILL_BATCH_SIZE])
+            if not batch:
+                break
+            for product in batch:
+                product.domain = domain_from_url(product.url)
+            Product._base_manager.bulk_update(batch, ['domain'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('tracker', '0002_product_domain'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_domain, migrations.RunPython.noop),
+    ]
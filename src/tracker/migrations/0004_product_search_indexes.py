@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 10:31
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built CONCURRENTLY so the table stays writable
+    atomic = False
+
+    dependencies = [
+        ('tracker', '0003_backfill_product_domain'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), condition=models.Q(('is_deleted', False)), name='idx_active_product_name_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['domain', 'id'], name='idx_active_product_domain'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['target_price', 'id'], name='idx_active_product_price'),
+        ),
+    ]
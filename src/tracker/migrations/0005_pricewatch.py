@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 10:33
+
+import django.db.models.deletion
+import uuid6
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_product_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceWatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('email', models.EmailField(max_length=254)),
+                ('threshold_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('last_triggered_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watches', to='tracker.product')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_deleted', False)), fields=['product', 'threshold_price'], name='idx_active_watch_threshold')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-19 10:33
+
+import uuid6
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_pricewatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor_name', models.CharField(max_length=255)),
+                ('args', models.JSONField(default=list)),
+                ('trace_carrier', models.JSONField(default=dict)),
+            ],
+        ),
+    ]
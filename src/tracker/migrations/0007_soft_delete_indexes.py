@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 10:37
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built CONCURRENTLY so the tables stay writable
+    atomic = False
+
+    dependencies = [
+        ('tracker', '0006_outboxmessage'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='pricewatch',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['updated_at'], name='idx_deleted_watch_updated'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['id'], name='idx_active_product_id'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['updated_at'], name='idx_deleted_product_updated'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_soft_delete_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
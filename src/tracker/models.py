@@ -1,8 +1,32 @@
+from urllib.parse import urlsplit
+
 import uuid6
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    Bulk soft delete / restore, each a single UPDATE ... WHERE id IN (...).
+    """
 
+    # Pass `now` to give rows deleted or restored together the same timestamp
+    def soft_delete(self, now=None):
+        return self.filter(is_deleted=False).update(
+            is_deleted=True,
+            updated_at=now or timezone.now(),
+        )
 
-class SoftDeleteManager(models.Manager):
+    def restore(self, now=None):
+        return self.filter(is_deleted=True).update(
+            is_deleted=False,
+            updated_at=now or timezone.now(),
+        )
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
 
@@ -18,19 +42,33 @@ class BaseModel(models.Model):
     is_deleted = models.BooleanField(default=False)
 
     objects = SoftDeleteManager()
-    all_objects = models.Manager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
 
     class Meta:
         abstract = True
 
     def soft_delete(self, **kwargs):
         self.is_deleted = True
-        self.save()
+        self.save(update_fields=["is_deleted", "updated_at"])
+
+
+def domain_from_url(url: str) -> str:
+    # Bare hostnames ("example.com") are parsed as a path without the leading "//"
+    if "//" not in url:
+        url = f"//{url}"
+    hostname = (urlsplit(url).hostname or "").lower()
+    return hostname.removeprefix("www.")
 
 
 class Product(BaseModel):
     name = models.CharField(max_length=255)
     url = models.URLField(unique=True)
+    # Denormalized from `url` so we can filter by retailer without parsing URLs in SQL
+    domain = models.CharField(
+        max_length=255,
+        editable=False,
+        default="",
+    )
     target_price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -43,4 +81,93 @@ class Product(BaseModel):
                 name="idx_active_product_url",
                 condition=models.Q(is_deleted=False),
             ),
+            # Matches the UPPER(name) LIKE UPPER(...) that `name__icontains` generates
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="idx_active_product_name_trgm",
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["domain", "id"],
+                name="idx_active_product_domain",
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["target_price", "id"],
+                name="idx_active_product_price",
+                condition=models.Q(is_deleted=False),
+            ),
+            # Keeps tombstones out of the id index that listing and lookups use
+            models.Index(
+                fields=["id"],
+                name="idx_active_product_id",
+                condition=models.Q(is_deleted=False),
+            ),
+            # Only tombstones, for the purge job
+            models.Index(
+                fields=["updated_at"],
+                name="idx_deleted_product_updated",
+                condition=models.Q(is_deleted=True),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.domain = domain_from_url(self.url)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "url" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "domain"}
+        super().save(*args, **kwargs)
+
+
+class PriceWatch(BaseModel):
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="watches",
+    )
+    email = models.EmailField()
+    # Alert once the scraped price drops to or below this value
+    threshold_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+    )
+    last_triggered_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["product", "threshold_price"],
+                name="idx_active_watch_threshold",
+                condition=models.Q(is_deleted=False),
+            ),
+            models.Index(
+                fields=["updated_at"],
+                name="idx_deleted_watch_updated",
+                condition=models.Q(is_deleted=True),
+            ),
         ]
+
+
+class OutboxMessage(models.Model):
+    """
+    A Dramatiq message recorded in the same transaction as the write that caused it.
+    Drained and published by the `relay_outbox` command.
+    """
+
+    # uuid7, so primary key order is insertion order
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid6.uuid7,
+        editable=False,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    actor_name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    trace_carrier = models.JSONField(default=dict)
+    # Failed publish attempts, rows at OUTBOX_RELAY_MAX_ATTEMPTS are dead letters
+    # the relay skips. Reset to 0 to have one published again.
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
@@ -0,0 +1,126 @@
+import dramatiq
+import structlog
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from dramatiq.errors import ActorNotFound, BrokerConnectionError
+from opentelemetry import metrics
+
+from src.tracker.models import OutboxMessage
+
+logger = structlog.get_logger()
+meter = metrics.get_meter("pricewatch.outbox")
+
+outbox_published_counter = meter.create_counter(
+    name="outbox_messages_published_total",
+    description="Total number of outbox messages published to the broker",
+    unit="1",
+)
+
+outbox_publish_failed_counter = meter.create_counter(
+    name="outbox_publish_failed_total",
+    description="Total number of outbox messages the broker did not confirm",
+    unit="1",
+)
+
+outbox_dead_lettered_counter = meter.create_counter(
+    name="outbox_messages_dead_lettered_total",
+    description="Total number of outbox messages given up on after failed publishes",
+    unit="1",
+)
+
+outbox_batch_size_histogram = meter.create_histogram(
+    name="outbox_relay_batch_size",
+    description="Number of outbox messages published per relay batch",
+    unit="1",
+)
+
+outbox_lag_histogram = meter.create_histogram(
+    name="outbox_message_lag_seconds",
+    description="Time between an outbox message being written and published",
+    unit="s",
+)
+
+
+def _record_failure(message, exc, dead: bool) -> None:
+    """
+    Counts a failed publish against the row. A dead row is skipped from now on.
+    """
+    max_attempts = settings.OUTBOX_RELAY_MAX_ATTEMPTS
+    attempts = max_attempts if dead else F("attempts") + 1
+    OutboxMessage.objects.filter(id=message.id).update(
+        attempts=attempts,
+        last_error=f"{type(exc).__name__}: {exc}",
+    )
+
+    if dead or message.attempts + 1 >= max_attempts:
+        outbox_dead_lettered_counter.add(1, {"actor_name": message.actor_name})
+        logger.error(
+            "outbox_message_dead_lettered",
+            outbox_message_id=str(message.id),
+            actor_name=message.actor_name,
+            created_at=message.created_at.isoformat(),
+            error_type=type(exc).__name__,
+            error=str(exc),
+        )
+
+
+def relay_batch(batch_size: int) -> int:
+    """
+    Publishes up to `batch_size` pending outbox messages and deletes them.
+
+    Rows are claimed with SKIP LOCKED, so several relays can run side by side.
+    A broker connection or confirm error stops publishing and the rest of the
+    batch stays in the outbox for the next pass. Any other error is counted
+    against the row alone, and after OUTBOX_RELAY_MAX_ATTEMPTS (or right away
+    for an unknown actor) the row is dead lettered and left in place.
+    Delivery is at-least-once.
+
+    :return: The number of messages published.
+    """
+    broker = dramatiq.get_broker()
+
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(attempts__lt=settings.OUTBOX_RELAY_MAX_ATTEMPTS)
+            .order_by("id")[:batch_size]
+        )
+
+        published = []
+        for message in messages:
+            try:
+                actor = broker.get_actor(message.actor_name)
+                actor.send(*message.args, message.trace_carrier)
+            except Exception as e:
+                outbox_publish_failed_counter.add(1, {"error_type": type(e).__name__})
+                logger.error(
+                    "outbox_publish_failed",
+                    outbox_message_id=str(message.id),
+                    actor_name=message.actor_name,
+                    attempts=message.attempts,
+                    error_type=type(e).__name__,
+                    error=str(e),
+                )
+                if isinstance(e, BrokerConnectionError):
+                    # Broker down or no confirm, the rest of the batch would fail too
+                    break
+                # e.g. an actor renamed or removed in a deploy
+                _record_failure(message, e, dead=isinstance(e, ActorNotFound))
+                continue
+
+            published.append(message.id)
+            outbox_lag_histogram.record(
+                (timezone.now() - message.created_at).total_seconds(),
+                {"actor_name": message.actor_name},
+            )
+
+        if published:
+            OutboxMessage.objects.filter(id__in=published).delete()
+
+    if messages:
+        outbox_published_counter.add(len(published))
+        outbox_batch_size_histogram.record(len(published))
+
+    return len(published)
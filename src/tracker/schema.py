@@ -1,16 +1,57 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
 from uuid import UUID
 
-from ninja import Schema
+from ninja import Field, Schema
 
 
 class ProductIn(Schema):
     name: str
     url: str
-    target_price: float
+    # Same precision as the column, so the response matches what is stored
+    target_price: Decimal = Field(..., max_digits=10, decimal_places=2)
 
 
 class ProductOut(Schema):
     id: UUID
     name: str
     url: str
-    target_price: float
+    target_price: Decimal
+
+
+class PriceWatchIn(Schema):
+    email: str
+    # Indexed as given, so it must already be at the column's precision
+    threshold_price: Decimal = Field(..., max_digits=10, decimal_places=2)
+
+
+class PriceWatchOut(Schema):
+    id: UUID
+    product_id: UUID
+    email: str
+    threshold_price: Decimal
+    last_triggered_at: Optional[datetime] = None
+
+
+class ProductSearchFilters(Schema):
+    q: Optional[str] = Field(None, min_length=3, max_length=255)
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    domain: Optional[str] = None
+    # Opaque keyset cursor, the `next_cursor` of the previous page
+    cursor: Optional[str] = None
+    limit: int = Field(50, ge=1, le=200)
+
+
+class ProductPage(Schema):
+    items: List[ProductOut]
+    next_cursor: Optional[str] = None
+
+
+class ProductIdsIn(Schema):
+    ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkResultOut(Schema):
+    count: int
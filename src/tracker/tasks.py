@@ -1,13 +1,20 @@
 import random
 import time
+from datetime import timedelta
+from decimal import Decimal
 
 import dramatiq
 import structlog
+from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 from opentelemetry import metrics, trace
 from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
 
-from src.tracker.models import Product
+from src.core.cache import cache_pipeline
+from src.tracker.alerts import find_crossed_watches
+from src.tracker.models import PriceWatch, Product
 
 logger = structlog.get_logger()
 tracer = trace.get_tracer("pricewatch.worker")
@@ -34,6 +41,66 @@ product_price_update_failed_counter = meter.create_counter(
     unit="1",
 )
 
+# 4. Tombstone purge
+soft_deleted_purged_counter = meter.create_counter(
+    name="soft_deleted_rows_purged_total",
+    description="Total number of soft deleted rows hard deleted by the purge job",
+    unit="1",
+)
+
+# 5. Price alert evaluation
+price_alert_evaluation_duration_histogram = meter.create_histogram(
+    name="price_alert_evaluation_duration_seconds",
+    description="Time taken to find the watch thresholds crossed by a scrape",
+    unit="s",
+)
+
+price_alert_fanout_size_histogram = meter.create_histogram(
+    name="price_alert_fanout_size",
+    description="Number of watches triggered by a single scrape",
+    unit="1",
+)
+
+price_alerts_triggered_counter = meter.create_counter(
+    name="price_alerts_triggered_total",
+    description="Total number of price watches triggered",
+    unit="1",
+)
+
+
+def evaluate_price_alerts(product_id: str, old_price, new_price) -> None:
+    """
+    Finds the watches crossed by a price change and fans them out
+    as batched notification messages.
+    """
+    start_time = time.time()
+    watch_ids = find_crossed_watches(product_id, old_price, new_price)
+    price_alert_evaluation_duration_histogram.record(time.time() - start_time)
+    price_alert_fanout_size_histogram.record(len(watch_ids))
+
+    if not watch_ids:
+        return
+
+    price_alerts_triggered_counter.add(len(watch_ids))
+
+    carrier = {}
+    propagator.inject(carrier=carrier)
+
+    batch_size = settings.PRICE_ALERT_BATCH_SIZE
+    for i in range(0, len(watch_ids), batch_size):
+        notify_price_watchers.send(
+            product_id,
+            watch_ids[i : i + batch_size],
+            str(new_price),
+            carrier,
+        )
+
+    logger.info(
+        "price_alerts_triggered",
+        product_id=product_id,
+        watch_count=len(watch_ids),
+    )
+
 
 @dramatiq.actor(max_retries=0)
 def update_product_price(
@@ -57,12 +124,16 @@ def update_product_price(
 
     start_time = time.time()
 
-    # 4. Start a new span in the worker
-    with tracer.start_as_current_span(
-        "worker.update_product_price",
-        context=parent_ctx,
-        links=[link],
-    ) as span:
+    # 4. Start a new span in the worker,
+    # cache writes made by the task are sent as one pipeline when it finishes
+    with (
+        tracer.start_as_current_span(
+            "worker.update_product_price",
+            context=parent_ctx,
+            links=[link],
+        ) as span,
+        cache_pipeline(),
+    ):
         # bind the domain-specific data for all logs
         # trace_id is handled automatically by the telemetry processor
         structlog.contextvars.bind_contextvars(product_id=product_id)
@@ -71,7 +142,7 @@ def update_product_price(
             scrape_time = random.uniform(0.5, 2.5)
             time.sleep(scrape_time)
 
-            new_price = random.uniform(40.99, 89.99)
+            new_price = Decimal(f"{random.uniform(40.99, 89.99):.2f}")
 
             product_price_scrape_duration_histogram.record(
                 time.time() - start_time,
@@ -79,11 +150,23 @@ def update_product_price(
             )
             product_price_update_counter.add(1, {"status": "success"})
 
-            Product.objects.filter(id=product_id).update(target_price=new_price)
+            # The row lock makes concurrent scrapes of a product (e.g. a message
+            # delivered twice) take turns, so each one sees the other's price
+            # and a threshold is only crossed once
+            with transaction.atomic():
+                old_price = (
+                    Product.objects.select_for_update()
+                    .filter(id=product_id)
+                    .values_list("target_price", flat=True)
+                    .first()
+                )
+                Product.objects.filter(id=product_id).update(target_price=new_price)
 
             cache_key = f"product:{product_id}"
             cache.delete(cache_key)
 
+            evaluate_price_alerts(product_id, old_price, new_price)
+
             logger.info(
                 "product_price_updated",
                 product_id=product_id,
@@ -99,3 +182,78 @@ def update_product_price(
                 error=str(e),
             )
             # Not re-raising since there are no retries at the moment
+
+
+@dramatiq.actor(max_retries=3)
+def notify_price_watchers(
+    product_id: str,
+    watch_ids: list,
+    new_price: str,
+    trace_carrier: dict,
+):
+    """
+    Notifies one batch of triggered watches.
+
+    :param product_id: The UUID of the product.
+    :param watch_ids: The UUIDs of the triggered watches.
+    :param new_price: The scraped price, as a string to keep it exact.
+    :param trace_carrier: A dictionary containing the trace context from the scrape.
+    """
+    parent_ctx = propagator.extract(carrier=trace_carrier)
+
+    with tracer.start_as_current_span(
+        "worker.notify_price_watchers",
+        context=parent_ctx,
+    ) as span:
+        span.set_attribute("price_alert.batch_size", len(watch_ids))
+        structlog.contextvars.bind_contextvars(product_id=product_id)
+
+        watches = PriceWatch.objects.filter(id__in=watch_ids)
+        for watch in watches:
+            # There is no mail integration yet, the log line is the notification
+            logger.info(
+                "price_watch_notified",
+                watch_id=str(watch.id),
+                email=watch.email,
+                threshold_price=watch.threshold_price,
+                new_price=new_price,
+            )
+
+        watches.update(last_triggered_at=timezone.now())
+
+
+@dramatiq.actor(max_retries=3)
+def purge_deleted_products():
+    """
+    Hard deletes one batch of soft deleted products and watches past the
+    retention period, then re-enqueues itself until nothing is left.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.SOFT_DELETE_RETENTION_DAYS)
+    batch_size = settings.SOFT_DELETE_PURGE_BATCH_SIZE
+
+    purged = 0
+    # Watches first, so the product delete cascades over as few rows as possible
+    for model in (PriceWatch, Product):
+        ids = list(
+            model.all_objects.filter(
+                is_deleted=True,
+                updated_at__lt=cutoff,
+            ).values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            continue
+
+        deleted, _ = model.all_objects.filter(id__in=ids).delete()
+        soft_deleted_purged_counter.add(deleted, {"model": model.__name__})
+        purged += len(ids)
+
+        logger.info(
+            "soft_deleted_rows_purged",
+            model=model.__name__,
+            count=deleted,
+        )
+
+    if purged:
+        purge_deleted_products.send_with_options(
+            delay=settings.SOFT_DELETE_PURGE_PAUSE_MS,
+        )